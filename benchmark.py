@@ -0,0 +1,565 @@
+# benchmark.py
+#
+# Performance benchmarks for the stress system.
+#
+#   python benchmark.py suite --students 200 --days 90 --output bench.json
+#   python benchmark.py routes | micro | indexes | concurrency
+#   python benchmark.py compare old.json new.json
+#
+# Every command accepts --output FILE to save its results as JSON, tagged
+# with the git commit, so runs can be compared across commits.
+# Runs against throwaway SQLite files — never the real instance database.
+
+import argparse
+import atexit
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app at a scratch database before it is imported
+BENCH_DIR = tempfile.mkdtemp(prefix="stressai-bench-")
+atexit.register(shutil.rmtree, BENCH_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(BENCH_DIR, 'app.db')}"
+
+import numpy as np
+from sqlalchemy import create_engine, select
+from werkzeug.security import generate_password_hash
+
+from app import (app, db, User, DailyStressLog, StressPredictionResult, FEATURE_COLUMNS,
+                 SUGGESTED_ACTIONS, rule_based_logic, rule_based_logic_batch, rebuild_rollups)
+from ml_model import (PREDICTION_CACHE_MAX_BATCH, predict_stress, predict_stress_batch, prediction_cache,
+                      use_compiled_forest, warm_up as warm_up_model)
+
+
+# ── HELPERS ───────────────────────────────────────────────────
+
+
+def time_call(fn, repeat=20):
+    """Median wall time of fn() in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def latency_stats(timings_ms, elapsed_s=None):
+    """Summary of a list of request / call timings in milliseconds."""
+    ordered = sorted(timings_ms)
+
+    def percentile(p):
+        return round(ordered[min(int(len(ordered) * p), len(ordered) - 1)], 3)
+
+    stats = {
+        "count":   len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms":  percentile(0.50),
+        "p95_ms":  percentile(0.95),
+        "p99_ms":  percentile(0.99),
+    }
+    if elapsed_s:
+        stats["throughput_rps"] = round(len(ordered) / elapsed_s, 1)
+    return stats
+
+
+def fill_history(conn, rows, users, seed=42):
+    """Inserts `rows` daily logs and the same number of predictions spread over `users` students."""
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    per_user = max(rows // users, 1)
+    batch_logs, batch_results = [], []
+
+    for i in range(rows):
+        user_id = i % users + 1
+        created_at = now - timedelta(days=(i // users) % per_user, minutes=rnd.randint(0, 600))
+        batch_logs.append((
+            user_id, rnd.uniform(0, 12), rnd.uniform(3, 10), rnd.randint(1, 10),
+            rnd.randint(1, 10), rnd.randint(1, 10), rnd.choice((-1, 0, 1)), created_at
+        ))
+        batch_results.append((
+            user_id, rnd.choice(("Low", "Moderate", "High")), rnd.uniform(40, 100),
+            rnd.choice((0, 20, 45, 75)), "benchmark", False, created_at
+        ))
+
+        if len(batch_logs) == 50_000 or i == rows - 1:
+            conn.exec_driver_sql(
+                "INSERT INTO daily_stress_log (user_id, study_hours, sleep_hours, mood_level, "
+                "assignment_pressure, study_consistency, performance_trend, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch_logs
+            )
+            conn.exec_driver_sql(
+                "INSERT INTO stress_prediction_result (user_id, stress_prediction, stress_confidence, "
+                "burnout_risk, suggested_action, alert_sent, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", batch_results
+            )
+            batch_logs, batch_results = [], []
+
+
+# ── INDEX BENCHMARK ───────────────────────────────────────────
+
+
+def hot_queries(user_id):
+    """The per-student query shapes used by the routes in app.py."""
+    now = datetime.utcnow()
+    return {
+        "auto_performance_trend": select(DailyStressLog).where(
+            DailyStressLog.user_id == user_id,
+            DailyStressLog.created_at >= now - timedelta(days=14)
+        ),
+        "api_chat recent logs": select(DailyStressLog).where(
+            DailyStressLog.user_id == user_id
+        ).order_by(DailyStressLog.created_at.desc()).limit(5),
+        "dashboard latest result": select(StressPredictionResult).where(
+            StressPredictionResult.user_id == user_id
+        ).order_by(StressPredictionResult.created_at.desc()).limit(1),
+        "analytics history": select(StressPredictionResult).where(
+            StressPredictionResult.user_id == user_id
+        ).order_by(StressPredictionResult.created_at.asc()),
+    }
+
+
+def bench_indexes(rows, users, repeat):
+    tables = [DailyStressLog.__table__, StressPredictionResult.__table__]
+    indexes = [index for table in tables for index in table.indexes]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        db.metadata.create_all(engine)
+
+        with engine.begin() as conn:
+            # Start from the pre-index schema
+            for index in indexes:
+                index.drop(conn)
+            print(f"Inserting {rows:,} logs and {rows:,} predictions for {users:,} students...")
+            fill_history(conn, rows, users)
+
+        queries = hot_queries(user_id=users // 2)
+        results = {}
+
+        with engine.connect() as conn:
+            for name, stmt in queries.items():
+                results[name] = {"before_ms": time_call(lambda: conn.execute(stmt).all(), repeat)}
+
+        with engine.begin() as conn:
+            for index in indexes:
+                index.create(conn)
+            conn.exec_driver_sql("ANALYZE")
+
+        with engine.connect() as conn:
+            for name, stmt in queries.items():
+                results[name]["after_ms"] = time_call(lambda: conn.execute(stmt).all(), repeat)
+
+        engine.dispose()
+
+    print(f"\n{'query':<28}{'before (ms)':>14}{'after (ms)':>14}")
+    for name, r in results.items():
+        print(f"{name:<28}{r['before_ms']:>14.3f}{r['after_ms']:>14.3f}")
+    return results
+
+
+# ── CONCURRENCY BENCHMARK ─────────────────────────────────────
+
+
+# SQLite settings compared by the concurrency benchmark
+SQLITE_PROFILES = {
+    # What the app ran with before: pysqlite's own 5 s busy timeout
+    "default (rollback journal)": {"SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL", "SQLITE_BUSY_TIMEOUT": 5000},
+    "WAL + synchronous=NORMAL":   {"SQLITE_JOURNAL_MODE": "WAL", "SQLITE_SYNCHRONOUS": "NORMAL", "SQLITE_BUSY_TIMEOUT": 5000},
+}
+
+DAILY_FORM = {
+    "study_hours": "7", "sleep_hours": "5.5", "mood_level": "3",
+    "assignment_pressure": "8", "study_consistency": "4",
+}
+
+
+def reset_app_database():
+    """Empties the scratch app database and recreates the schema."""
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+        db.drop_all()
+        db.create_all()
+
+
+def create_students(count, password="bench"):
+    """Adds `count` students sharing one password; returns their usernames."""
+    hashed = generate_password_hash(password)
+    usernames = [f"bench_student_{i}" for i in range(count)]
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [
+            {"username": u, "email": f"{u}@example.com", "password": hashed, "role": "student"}
+            for u in usernames
+        ])
+        db.session.commit()
+    return usernames
+
+
+def logged_in_client(username, password="bench"):
+    client = app.test_client()
+    client.post("/login", data={"username": username, "password": password})
+    return client
+
+
+def submit_daily_forms(username, submissions, settings, start_at):
+    """Worker process body: log in as `username` and POST /daily_form repeatedly."""
+    app.config.update(settings)
+    app.logger.disabled = True
+    # Never reuse connections inherited from the parent process
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    client = logged_in_client(username)
+    latencies, errors = [], []
+
+    # Start all workers at the same moment
+    time.sleep(max(start_at - time.time(), 0))
+    for _ in range(submissions):
+        start = time.perf_counter()
+        try:
+            response = client.post("/daily_form", data=DAILY_FORM)
+            if response.status_code != 302:
+                errors.append(response.status_code)
+        except Exception as e:   # "database is locked" surfaces here
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies, errors
+
+
+def bench_concurrency(workers, submissions):
+    """
+    Throughput of simultaneous /daily_form submissions under each SQLite
+    profile, with one process per simulated server worker.
+    """
+    results = {}
+    context = multiprocessing.get_context("fork")
+
+    for name, settings in SQLITE_PROFILES.items():
+        app.config.update(settings)
+        reset_app_database()
+        with app.app_context():
+            # journal_mode is persistent in the file, so set it explicitly
+            db.session.execute(db.text(f"PRAGMA journal_mode={settings['SQLITE_JOURNAL_MODE']}"))
+            db.session.commit()
+            db.engine.dispose()
+
+        usernames = create_students(workers)
+        # Load the model before forking so workers don't each pay for it
+        warm_up_model()
+
+        start_at = time.time() + 2
+        with context.Pool(workers) as pool:
+            outcomes = pool.starmap(
+                submit_daily_forms, [(u, submissions, settings, start_at) for u in usernames]
+            )
+        elapsed = time.time() - start_at
+
+        latencies = sorted(l for outcome in outcomes for l in outcome[0])
+        errors = [e for outcome in outcomes for e in outcome[1]]
+        total = workers * submissions
+        results[name] = {
+            "submissions":    total,
+            "errors":         len(errors),
+            "throughput_rps": round((total - len(errors)) / elapsed, 1),
+            **latency_stats(latencies),
+        }
+
+    print(f"\n{'profile':<30}{'ok/s':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<30}{r['throughput_rps']:>8}{r['errors']:>8}{r['p50_ms']:>10}{r['p95_ms']:>10}")
+    return results
+
+
+# ── SYNTHETIC DATA ────────────────────────────────────────────
+
+
+def generate_history(students, days, seed=42, chunk_size=20_000):
+    """
+    Fills the scratch app database with `students` students, each with one
+    scored check-in per day for `days` days, plus a "bench_counselor"
+    account. Predictions come from the real model and rule engine.
+    """
+    reset_app_database()
+    create_students(students)
+    with app.app_context():
+        db.session.add(User(
+            username="bench_counselor", email="counselor@example.com",
+            password=generate_password_hash("bench"), role="counselor"
+        ))
+        db.session.commit()
+
+        user_ids = [u.id for u in User.query.filter_by(role="student").order_by(User.id)]
+        rng = np.random.default_rng(seed)
+        now = datetime.utcnow()
+        per_chunk = max(chunk_size // max(days, 1), 1)
+
+        for i in range(0, len(user_ids), per_chunk):
+            chunk_users = np.repeat(user_ids[i:i + per_chunk], days)
+            day_offsets = np.tile(np.arange(days), len(user_ids[i:i + per_chunk]))
+            n = len(chunk_users)
+
+            features = {
+                "study_hours":         rng.integers(0, 25, n) / 2,
+                "sleep_hours":         rng.integers(6, 21, n) / 2,
+                "mood_level":          rng.integers(1, 11, n),
+                "assignment_pressure": rng.integers(1, 11, n),
+                "study_consistency":   rng.integers(1, 11, n),
+                "performance_trend":   rng.integers(-1, 2, n),
+            }
+            labels, confidences = predict_stress_batch(np.column_stack([features[c] for c in FEATURE_COLUMNS]))
+            burnout, codes = rule_based_logic_batch(features, labels, confidences)
+            created_at = [now - timedelta(days=int(d), minutes=int(m))
+                          for d, m in zip(day_offsets, rng.integers(0, 600, n))]
+
+            log_ids = db.session.execute(
+                DailyStressLog.__table__.insert().returning(DailyStressLog.id, sort_by_parameter_order=True),
+                [
+                    {"user_id": int(chunk_users[j]), "created_at": created_at[j],
+                     **{c: features[c][j].item() for c in FEATURE_COLUMNS}}
+                    for j in range(n)
+                ]
+            ).scalars().all()
+            db.session.execute(StressPredictionResult.__table__.insert(), [
+                {
+                    "user_id": int(chunk_users[j]), "log_id": log_ids[j],
+                    "stress_prediction": str(labels[j]), "stress_confidence": float(confidences[j]),
+                    "burnout_risk": int(burnout[j]), "suggested_action": SUGGESTED_ACTIONS[codes[j]],
+                    "alert_sent": bool(burnout[j] > 70 or labels[j] == "High"), "created_at": created_at[j],
+                }
+                for j in range(n)
+            ])
+            db.session.commit()
+
+        rebuild_rollups()
+
+    return {"students": students, "days": days, "rows": students * days}
+
+
+# ── ROUTE BENCHMARK ───────────────────────────────────────────
+
+
+def route_cases(student_id):
+    """(name, role, method, path, form data) for every route under test."""
+    return [
+        ("GET /dashboard",               "student",   "get",  "/dashboard", None),
+        ("GET /daily_form",              "student",   "get",  "/daily_form", None),
+        ("POST /daily_form",             "student",   "post", "/daily_form", DAILY_FORM),
+        ("GET /analytics",               "student",   "get",  "/analytics", None),
+        ("GET /api/timeseries",          "student",   "get",  "/api/timeseries", None),
+        ("GET /counselor",               "counselor", "get",  "/counselor", None),
+        ("GET /counselor/student/<id>",  "counselor", "get",  f"/counselor/student/{student_id}", None),
+    ]
+
+
+def bench_routes(requests_per_route):
+    """Latency and sequential throughput of each route through the Flask test client."""
+    app.logger.disabled = True
+    clients = {
+        "student":   logged_in_client("bench_student_0"),
+        "counselor": logged_in_client("bench_counselor"),
+    }
+    with app.app_context():
+        student_id = User.query.filter_by(username="bench_student_0").first().id
+
+    # One untimed pass so lazy loading (model, templates) isn't measured
+    for _, role, method, path, data in route_cases(student_id):
+        getattr(clients[role], method)(path, data=data)
+
+    results = {}
+    for name, role, method, path, data in route_cases(student_id):
+        timings, failures = [], 0
+        start = time.perf_counter()
+        for _ in range(requests_per_route):
+            t = time.perf_counter()
+            response = getattr(clients[role], method)(path, data=data)
+            timings.append((time.perf_counter() - t) * 1000)
+            failures += response.status_code >= 400
+        results[name] = {**latency_stats(timings, time.perf_counter() - start), "errors": failures}
+
+    print(f"\n{'route':<30}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<30}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['throughput_rps']:>10}")
+    return results
+
+
+# ── MICRO BENCHMARKS ──────────────────────────────────────────
+
+
+def bench_micro(repeat, batch_size=1000, seed=42):
+    """predict_stress / predict_stress_batch and rule_based_logic, scalar vs batched."""
+    rng = np.random.default_rng(seed)
+    single = [5.0, 7.0, 5, 5, 5, 0]
+    batch = np.column_stack([
+        rng.integers(0, 25, batch_size) / 2, rng.integers(6, 21, batch_size) / 2,
+        rng.integers(1, 11, (batch_size, 3)), rng.integers(-1, 2, batch_size),
+    ])
+    records = [dict(zip(FEATURE_COLUMNS, row)) for row in batch.tolist()]
+    columns = {c: batch[:, i] for i, c in enumerate(FEATURE_COLUMNS)}
+    labels, confidences = predict_stress_batch(batch)
+
+    results = {}
+    results["predict_stress (memoized)"] = {"median_ms": time_call(lambda: predict_stress(single), repeat)}
+    # Only small batches go through the cache
+    small = batch[:PREDICTION_CACHE_MAX_BATCH]
+    predict_stress_batch(small)
+    results[f"predict_stress_batch x{len(small)} (memoized)"] = {
+        "median_ms": time_call(lambda: predict_stress_batch(small), repeat)
+    }
+
+    # The rest measures the model itself, so every call has to miss
+    cache_size, prediction_cache.maxsize = prediction_cache.maxsize, 0
+    for compiled in (False, True):
+        use_compiled_forest(compiled)
+        suffix = " (compiled)" if compiled else ""
+        results[f"predict_stress{suffix}"] = {"median_ms": time_call(lambda: predict_stress(single), repeat)}
+        results[f"predict_stress_batch x{batch_size}{suffix}"] = {
+            "median_ms": time_call(lambda: predict_stress_batch(batch), max(repeat // 10, 3))
+        }
+    use_compiled_forest(None)
+    prediction_cache.maxsize = cache_size
+
+    results[f"rule_based_logic x{batch_size}"] = {"median_ms": time_call(
+        lambda: [rule_based_logic(r, l, c) for r, l, c in zip(records, labels, confidences)], repeat
+    )}
+    results[f"rule_based_logic_batch x{batch_size}"] = {"median_ms": time_call(
+        lambda: rule_based_logic_batch(columns, labels, confidences), repeat
+    )}
+
+    print(f"\n{'call':<40}{'median ms':>12}")
+    for name, r in results.items():
+        print(f"{name:<40}{r['median_ms']:>12.3f}")
+    return results
+
+
+# ── RESULTS ───────────────────────────────────────────────────
+
+
+def run_metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        "commit":    commit,
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+        "python":    sys.version.split()[0],
+        "platform":  platform.platform(),
+        "cpus":      os.cpu_count(),
+        "args":      {k: v for k, v in vars(args).items() if k not in ("output", "old", "new")},
+    }
+
+
+def flatten(results, prefix=""):
+    """{"routes": {"GET /x": {"p50_ms": 1}}} → {"routes / GET /x / p50_ms": 1}"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix} / {key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(old_path, new_path, threshold):
+    """Prints every timing that changed, flagging slowdowns above `threshold` percent."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"{old['meta'].get('commit')} → {new['meta'].get('commit')}\n")
+    old_flat, new_flat = flatten(old["results"]), flatten(new["results"])
+    regressions = 0
+
+    for name in sorted(old_flat.keys() & new_flat.keys()):
+        if not name.endswith("_ms") or not old_flat[name]:
+            continue
+        change = (new_flat[name] - old_flat[name]) / old_flat[name] * 100
+        flag = "  REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"{name:<70}{old_flat[name]:>10.3f}{new_flat[name]:>10.3f}{change:>+9.1f}%{flag}")
+
+    return regressions
+
+
+# ── CLI ───────────────────────────────────────────────────────
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="StressAI performance benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_data_args(p):
+        p.add_argument("--students", type=int, default=200)
+        p.add_argument("--days", type=int, default=90)
+        p.add_argument("--requests", type=int, default=50, help="per route")
+        p.add_argument("--repeat", type=int, default=100, help="micro-benchmark repetitions")
+
+    p = sub.add_parser("suite", help="synthetic history + routes + micro-benchmarks")
+    add_data_args(p)
+
+    p = sub.add_parser("routes", help="route latency through the Flask test client")
+    add_data_args(p)
+
+    p = sub.add_parser("micro", help="predict_stress and rule_based_logic")
+    p.add_argument("--repeat", type=int, default=100)
+
+    p = sub.add_parser("indexes", help="per-student query latency with and without composite indexes")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--users", type=int, default=2_000)
+    p.add_argument("--repeat", type=int, default=20)
+
+    p = sub.add_parser("concurrency", help="simultaneous /daily_form submissions per SQLite profile")
+    p.add_argument("--workers", type=int, default=8, help="concurrent processes")
+    p.add_argument("--submissions", type=int, default=50, help="per worker")
+
+    for p in sub.choices.values():
+        p.add_argument("--output", help="write results as JSON to this file")
+
+    p = sub.add_parser("compare", help="compare two --output files")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--threshold", type=float, default=10.0, help="percent slowdown flagged as a regression")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        sys.exit(1 if compare(args.old, args.new, args.threshold) else 0)
+
+    results = {}
+    if args.command in ("suite", "routes"):
+        start = time.perf_counter()
+        results["data"] = generate_history(args.students, args.days)
+        print(f"Generated {results['data']['rows']:,} check-ins in {time.perf_counter() - start:.1f}s")
+        results["routes"] = bench_routes(args.requests)
+    if args.command in ("suite", "micro"):
+        results["micro"] = bench_micro(args.repeat)
+    if args.command == "indexes":
+        results["indexes"] = bench_indexes(args.rows, args.users, args.repeat)
+    if args.command == "concurrency":
+        results["concurrency"] = bench_concurrency(args.workers, args.submissions)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": run_metadata(args), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
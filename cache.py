@@ -0,0 +1,216 @@
+# cache.py
+#
+# Small caches shared by the app — in-process, or on disk across workers.
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def atomic_write(path, write):
+    """
+    Calls write(temp_path), then renames the temp file over `path`.
+
+    The temp file is in the same directory, so the rename is atomic:
+    readers either see the old file or the complete new one. If write()
+    or the rename fails, the temp file is removed.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        # Already renamed away unless something failed
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with an optional TTL.
+
+    Each process has its own copy. Anything cached here can therefore be
+    up to `ttl` seconds stale in other workers after an invalidation.
+
+    invalidate() bumps an epoch. A caller that builds a value from the
+    database can read `cache.epoch` first and pass it to set(). If an
+    invalidation happened in between, the set is dropped, so a slow reader
+    never puts pre-invalidation data back into the cache.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, epoch=None):
+        with self._lock:
+            if epoch is not None and epoch != self.epoch:
+                return
+            expires = time.monotonic() + self.ttl if self.ttl else None
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self.epoch += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.epoch += 1
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size":      len(self._data),
+            "maxsize":   self.maxsize,
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "evictions": self.evictions,
+            "hit_rate":  round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class FileCache:
+    """
+    Size-bounded cache of byte strings in a directory, shared by every
+    worker process that points at the same directory.
+
+    Same get / set / clear / stats interface as LRUCache. Entries are
+    written atomically (temp file + rename). get() touches the file, and
+    once the directory grows past `max_bytes` the least recently used files
+    are deleted until it is back under 90% of the limit.
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, ttl=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None       # bytes on disk, as far as this process knows
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode()).hexdigest())
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            if self.ttl and os.stat(path).st_mtime + self.ttl < time.time():
+                raise FileNotFoundError(path)
+            with open(path, "rb") as f:
+                value = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return default
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, epoch=None):
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(value)
+
+        atomic_write(self._path(key), write)
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            self._size += len(value)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".tmp"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _disk_usage(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # Other processes write here too, so re-measure instead of trusting _size
+        entries = sorted(self._entries())
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def invalidate(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size":      len(self),
+            "max_bytes": self.max_bytes,
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "evictions": self.evictions,
+            "hit_rate":  round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,92 @@
+# chat_client.py
+#
+# Thin client for the Anthropic Messages API used by the AI counselor chat.
+# One ChatClient is shared by the whole process so every chat turn reuses
+# pooled keep-alive connections instead of paying a new TLS handshake.
+
+import json
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://api.anthropic.com"
+API_VERSION = "2023-06-01"
+CHAT_MODEL = "claude-3-5-sonnet-20241022"
+
+
+class ChatAPIError(Exception):
+    """The chat API answered with an error instead of a reply."""
+
+
+class ChatClient:
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=30, pool_size=20):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _post(self, api_key, system, messages, stream):
+        response = self.session.post(
+            f"{self.base_url}/v1/messages",
+            headers={
+                "Content-Type": "application/json",
+                "x-api-key": api_key,
+                "anthropic-version": API_VERSION
+            },
+            json={
+                "model": CHAT_MODEL,
+                "max_tokens": 1024,
+                "system": system,
+                "messages": messages,
+                "stream": stream
+            },
+            timeout=self.timeout,
+            stream=stream
+        )
+
+        # Check for API errors
+        if response.status_code != 200:
+            try:
+                error_msg = response.json().get("error", {}).get("message", "Unknown API error")
+            except ValueError:
+                error_msg = f"HTTP {response.status_code}"
+            finally:
+                response.close()
+            raise ChatAPIError(error_msg)
+
+        return response
+
+    def complete(self, api_key, system, messages):
+        """Returns the whole reply text once generation has finished."""
+        response = self._post(api_key, system, messages, stream=False)
+        return response.json()["content"][0]["text"]
+
+    def stream(self, api_key, system, messages):
+        """
+        Yields reply text fragments as the API produces them.
+
+        Parses the server-sent event stream of the Messages API and only
+        forwards text deltas; the connection goes back to the pool when
+        the generator finishes or is closed.
+        """
+        response = self._post(api_key, system, messages, stream=True)
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+
+                event = json.loads(line[len("data:"):])
+                event_type = event.get("type")
+
+                if event_type == "content_block_delta" and event["delta"].get("type") == "text_delta":
+                    yield event["delta"]["text"]
+                elif event_type == "error":
+                    raise ChatAPIError(event.get("error", {}).get("message", "Unknown API error"))
+                elif event_type == "message_stop":
+                    break
+        finally:
+            response.close()
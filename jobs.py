@@ -0,0 +1,71 @@
+# jobs.py
+#
+# In-process background worker for work that should not hold up a request.
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchWorker:
+    """
+    Daemon thread that drains a queue of pending work in micro-batches.
+
+    The queue itself lives elsewhere (e.g. rows flagged as pending in the
+    database); `handler(limit)` processes up to `limit` items and returns
+    how many it handled. notify() wakes the worker; after waking it
+    lingers briefly so submissions arriving together share one batch.
+    It also polls every `poll_interval` seconds, so work left behind by a
+    crash or by another process is picked up without a notify().
+
+    The thread is started lazily on first notify() — never at import — so
+    it is created in the process that serves requests, after any fork.
+    """
+
+    def __init__(self, handler, batch_size=64, linger=0.05, poll_interval=5.0, name="micro-batch-worker"):
+        self.handler = handler
+        self.batch_size = batch_size
+        self.linger = linger
+        self.poll_interval = poll_interval
+        self.name = name
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        self.start()
+        self._wake.set()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            if self._wake.wait(self.poll_interval):
+                time.sleep(self.linger)
+            self._wake.clear()
+
+            try:
+                # Keep going while full batches come back — more is waiting
+                while not self._stopping.is_set() and self.handler(self.batch_size) >= self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("%s: batch failed", self.name)
@@ -0,0 +1,165 @@
+# metrics.py
+#
+# In-process counters and histograms rendered in the Prometheus text format,
+# plus a per-request breakdown of where the time went (DB, model, templates,
+# outbound HTTP).
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Request latencies, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic total per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _format_labels(self.labels, k), v) for k, v in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # label values → [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    out.append((f"{self.name}_bucket", _format_labels(self.labels, key, [le]), cumulative))
+                out.append((f"{self.name}_sum", _format_labels(self.labels, key), series[-1]))
+                out.append((f"{self.name}_count", _format_labels(self.labels, key), cumulative))
+        return out
+
+
+class MetricsRegistry:
+    """
+    The metrics of one process.
+
+    Every worker process keeps its own numbers, so scrape each worker (or
+    sum them) when running several — the totals are not shared.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# ── REQUEST BREAKDOWN ─────────────────────────────────────────
+
+
+class RequestBreakdown:
+    """Time spent per phase ("db", "predict", ...) while serving one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.seconds = {}
+        self.db_queries = 0
+
+    def add(self, phase, seconds):
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+
+
+# Set by the app around each request; None in CLI commands and background threads
+current_breakdown = ContextVar("current_breakdown", default=None)
+
+registry = MetricsRegistry()
+
+PHASE_SECONDS = registry.histogram(
+    "stressai_phase_seconds",
+    "Duration of instrumented operations (db query, predict, render, chat_api), inside or outside requests",
+    labels=("phase",),
+)
+
+
+def record_phase(phase, seconds):
+    """Adds `seconds` of `phase` to the process totals and the current request, if any."""
+    PHASE_SECONDS.observe(seconds, phase=phase)
+    breakdown = current_breakdown.get()
+    if breakdown is not None:
+        breakdown.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase):
+    """with timed("predict"): ...  — records how long the block took."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - start)
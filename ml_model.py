@@ -1,18 +1,492 @@
 # ml_model.py
 
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
 import joblib
 import numpy as np
 
-# Load saved model and encoder
-# FIX: wrapped in try/except so Flask gives a clear error if files are missing
-try:
-    model = joblib.load("model.pkl")
-    label_encoder = joblib.load("label_encoder.pkl")
-except FileNotFoundError:
-    raise FileNotFoundError(
-        "model.pkl or label_encoder.pkl not found. "
-        "Please run train_model.py first to generate these files."
-    )
+from cache import LRUCache, atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Resolved relative to this file, not the working directory, so CLIs and
+# scripts run from anywhere; override with environment variables
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.environ.get("STRESS_MODEL_PATH", os.path.join(BASE_DIR, "model.pkl"))
+LABEL_ENCODER_PATH = os.environ.get("STRESS_LABEL_ENCODER_PATH", os.path.join(BASE_DIR, "label_encoder.pkl"))
+
+# Flat export of the forest (see export_forest); preferred over model.pkl when present and up to date
+FOREST_PATH = os.environ.get("STRESS_FOREST_PATH", os.path.join(BASE_DIR, "model.forest"))
+
+# Seconds between checks for a newly written model file (negative disables hot reload)
+RELOAD_CHECK_INTERVAL = float(os.environ.get("STRESS_MODEL_RELOAD_INTERVAL", 5))
+
+# Distinct feature vectors whose prediction is remembered (0 disables)
+PREDICTION_CACHE_SIZE = int(os.environ.get("STRESS_PREDICTION_CACHE_SIZE", 4096))
+
+# Larger batches (imports, rescoring) skip the cache: they are mostly unique
+# rows that would evict the interactive working set, and the per-row lookups
+# cost more than they save on the vectorised path
+PREDICTION_CACHE_MAX_BATCH = int(os.environ.get("STRESS_PREDICTION_CACHE_MAX_BATCH", 64))
+
+# Model input columns, in the order predict_stress() expects them
+FEATURE_COLUMNS = [
+    "study_hours",
+    "sleep_hours",
+    "mood_level",
+    "assignment_pressure",
+    "study_consistency",
+    "performance_trend",
+]
+
+
+# ── COMPILED FOREST ───────────────────────────────────────────
+
+
+class CompiledForest:
+    """
+    Flattened, pure-NumPy copy of a fitted RandomForestClassifier.
+
+    All trees are concatenated into one set of node arrays, so a whole
+    batch of rows walks every tree at the same time — one vectorised
+    step per tree level instead of one Python call per tree per row.
+    """
+
+    def __init__(self, feature, threshold, left, right, leaf_proba, roots, max_depth):
+        self.feature    = feature      # split feature per node (-2 for leaves)
+        self.threshold  = threshold    # split threshold per node
+        self.left       = left         # global index of left child (-1 for leaves)
+        self.right      = right        # global index of right child (-1 for leaves)
+        self.leaf_proba = leaf_proba   # normalised class distribution per node
+        self.roots      = roots        # global index of each tree's root node
+        self.max_depth  = max_depth
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        features, thresholds, lefts, rights, probas, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+
+            # Same normalisation DecisionTreeClassifier.predict_proba applies
+            values = tree.value[:, 0, :]
+            normalizer = values.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+
+            features.append(np.where(is_leaf, -2, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+            rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+            probas.append(values / normalizer)
+            roots.append(offset)
+
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            leaf_proba=np.concatenate(probas).astype(np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=int(max_depth),
+        )
+
+    def apply(self, X):
+        """Returns the leaf index reached in every tree, shape (n_rows, n_trees)."""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.size)).copy()
+
+        for _ in range(self.max_depth):
+            feature = self.feature[nodes]
+            internal = feature >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, np.where(internal, feature, 0)] <= self.threshold[nodes]
+            step = np.where(go_left, self.left[nodes], self.right[nodes])
+            nodes = np.where(internal, step, nodes)
+
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[0], self.leaf_proba.shape[1]))
+        # Accumulate tree by tree, in estimator order, like the forest does
+        for t in range(leaves.shape[1]):
+            proba += self.leaf_proba[leaves[:, t]]
+        proba /= leaves.shape[1]
+        return proba
+
+
+# ── FOREST FILE ───────────────────────────────────────────────
+#
+# One uncompressed file that every worker process maps read-only, so the
+# OS keeps a single copy of the forest in the page cache however many
+# workers there are, and loading is just reading a small header:
+#
+#   8 bytes   magic FOREST_MAGIC
+#   8 bytes   header length, little-endian uint64
+#   header    JSON — version, class labels, n_features, max_depth, and
+#             dtype / shape / offset of every array
+#   arrays    raw little-endian CompiledForest arrays, 64-byte aligned
+
+FOREST_MAGIC = b"STRFRST1"
+FOREST_ARRAYS = ("feature", "threshold", "left", "right", "leaf_proba", "roots")
+FOREST_ALIGN = 64
+
+
+def export_forest(model, label_encoder, path=FOREST_PATH, version=None):
+    """
+    Writes a fitted forest + encoder as a forest file, atomically.
+
+    version = reported as the model version once loaded — pass the
+              model.pkl version so both formats report the same one;
+              defaults to a hash of the forest arrays
+    """
+    compiled = CompiledForest.from_sklearn(model)
+    arrays = {name: np.ascontiguousarray(getattr(compiled, name)) for name in FOREST_ARRAYS}
+    arrays = {name: a.astype(a.dtype.newbyteorder("<")) for name, a in arrays.items()}
+
+    if version is None:
+        digest = hashlib.sha1()
+        for array in arrays.values():
+            digest.update(array.tobytes())
+        version = digest.hexdigest()[:12]
+
+    # Offsets are relative to the end of the header, which is itself padded
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = -(-offset // FOREST_ALIGN) * FOREST_ALIGN
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+
+    header = json.dumps({
+        "version":    version,
+        "classes":    [str(c) for c in label_encoder.inverse_transform(model.classes_)],
+        "n_features": int(model.n_features_in_),
+        "max_depth":  compiled.max_depth,
+        "arrays":     layout,
+    }).encode()
+    header += b" " * (-(len(FOREST_MAGIC) + 8 + len(header)) % FOREST_ALIGN)
+
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            f.write(FOREST_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            data_start = f.tell()
+            for name, array in arrays.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(array.tobytes())
+
+    atomic_write(path, write)
+
+
+def load_forest(path=FOREST_PATH):
+    """
+    Maps a forest file read-only.
+
+    Returns:
+        compiled (CompiledForest): arrays are np.memmap views of the file
+        meta (dict):               the JSON header
+    """
+    with open(path, "rb") as f:
+        if f.read(len(FOREST_MAGIC)) != FOREST_MAGIC:
+            raise ValueError(f"{path} is not a forest file")
+        header_length = int.from_bytes(f.read(8), "little")
+        meta = json.loads(f.read(header_length))
+    data_start = len(FOREST_MAGIC) + 8 + header_length
+
+    arrays = {
+        name: np.memmap(path, dtype=np.dtype(spec["dtype"]), mode="r",
+                        offset=data_start + spec["offset"], shape=tuple(spec["shape"]))
+        for name, spec in meta["arrays"].items()
+    }
+    return CompiledForest(max_depth=meta["max_depth"], **arrays), meta
+
+
+# ── MODEL REGISTRY ────────────────────────────────────────────
+
+
+def file_version(path):
+    """Short content hash of a model file — what the registry reports as its version."""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+class LoadedModel:
+    """
+    One consistent model + encoder pair, never mutated after loading.
+
+    Loaded from a forest file, predictions only need the memory-mapped
+    CompiledForest and the labels from the file's header. The sklearn
+    model and encoder are unpickled on first access of .model /
+    .label_encoder, and only if model.pkl is still the version the forest
+    was exported from.
+    """
+
+    def __init__(self, model, label_encoder, version, compiled=None, model_path=None, label_encoder_path=None):
+        self._model = model
+        self._label_encoder = label_encoder
+        self.version = version
+        self.compiled = compiled
+        self.model_path = model_path
+        self.label_encoder_path = label_encoder_path
+        self._lock = threading.Lock()
+
+        if model is not None:
+            # Column order of model.predict_proba → human-readable label.
+            # model.classes_ holds the encoded ints, so map them through the encoder
+            # once here instead of calling inverse_transform on every prediction.
+            self.class_labels = label_encoder.inverse_transform(model.classes_)
+            self.n_features = model.n_features_in_
+
+    @classmethod
+    def from_forest_file(cls, path, model_path=None, label_encoder_path=None):
+        compiled, meta = load_forest(path)
+        loaded = cls(None, None, meta["version"], compiled, model_path, label_encoder_path)
+        loaded.class_labels = np.asarray(meta["classes"])
+        loaded.n_features = meta["n_features"]
+        return loaded
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._load_pickles()
+        return self._model
+
+    @property
+    def label_encoder(self):
+        if self._model is None:
+            self._load_pickles()
+        return self._label_encoder
+
+    def _load_pickles(self):
+        with self._lock:
+            if self._model is not None:
+                return
+            if self.model_path is None:
+                raise FileNotFoundError("This model was loaded from a forest file without a model.pkl")
+
+            version = file_version(self.model_path)
+            if version != self.version:
+                raise RuntimeError(
+                    f"{self.model_path} is version {version}, not the forest file's {self.version}"
+                )
+            self._label_encoder = joblib.load(self.label_encoder_path)
+            self._model = joblib.load(self.model_path)
+
+
+class ModelRegistry:
+    """
+    Lazily loads model.pkl / label_encoder.pkl on first use and swaps in
+    a new pair when the model file changes on disk.
+
+    If a forest file exists that is at least as new as model.pkl it is
+    memory-mapped instead, and the pickles are only unpickled if a caller
+    asks for the sklearn model (see LoadedModel).
+
+    Reloads build a complete LoadedModel before replacing the reference,
+    so a prediction always sees one consistent model, and a half-written
+    or broken file leaves the current model in place. Writers should
+    still replace files atomically (write a temp file, then os.replace).
+    """
+
+    def __init__(self, model_path=MODEL_PATH, label_encoder_path=LABEL_ENCODER_PATH,
+                 check_interval=RELOAD_CHECK_INTERVAL, forest_path=FOREST_PATH):
+        self.model_path = model_path
+        self.label_encoder_path = label_encoder_path
+        self.forest_path = forest_path
+        self.check_interval = check_interval
+        self.use_compiled = None     # see use_compiled_forest()
+        self.reload_listeners = []   # called with no arguments after a new model is swapped in
+        self._loaded = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _file_stamp(self):
+        stats = [os.stat(p) if os.path.exists(p) else None
+                 for p in (self.model_path, self.label_encoder_path, self.forest_path)]
+        return tuple((s.st_mtime_ns, s.st_size) if s else None for s in stats)
+
+    def _forest_is_current(self, stamp):
+        model_stamp, _, forest_stamp = stamp
+        return forest_stamp is not None and (model_stamp is None or forest_stamp[0] >= model_stamp[0])
+
+    def _load(self):
+        stamp = self._file_stamp()
+        if self.use_compiled is not False and self._forest_is_current(stamp):
+            loaded = LoadedModel.from_forest_file(self.forest_path, self.model_path, self.label_encoder_path)
+            return loaded, stamp
+        if stamp[2] is not None and self.use_compiled is not False:
+            logger.warning("%s is older than %s; loading the pickle", self.forest_path, self.model_path)
+
+        # FIX: clear error if files are missing
+        try:
+            version = file_version(self.model_path)
+            model = joblib.load(self.model_path)
+            label_encoder = joblib.load(self.label_encoder_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                "model.pkl or label_encoder.pkl not found. "
+                "Please run train_model.py first to generate these files."
+            )
+
+        compiled = CompiledForest.from_sklearn(model) if self.use_compiled else None
+        return LoadedModel(model, label_encoder, version, compiled), stamp
+
+    def get(self):
+        loaded = self._loaded
+        if loaded is None:
+            with self._lock:
+                if self._loaded is None:
+                    self._loaded, self._stamp = self._load()
+                    self._checked_at = time.monotonic()
+                    logger.info("Loaded stress model %s", self._loaded.version)
+                return self._loaded
+
+        if self.check_interval >= 0 and time.monotonic() - self._checked_at >= self.check_interval:
+            self._maybe_reload()
+        return self._loaded
+
+    def _maybe_reload(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                if self._file_stamp() == self._stamp:
+                    return
+                self._loaded, self._stamp = self._load()
+                logger.info("Reloaded stress model %s", self._loaded.version)
+                self._notify_reload()
+            except Exception:
+                logger.exception("Model reload failed; keeping version %s", self._loaded.version)
+
+    def reload(self):
+        """Loads the files now, regardless of whether they changed."""
+        with self._lock:
+            self._loaded, self._stamp = self._load()
+            self._checked_at = time.monotonic()
+            self._notify_reload()
+        return self._loaded
+
+    def _notify_reload(self):
+        for listener in self.reload_listeners:
+            listener()
+
+    @property
+    def version(self):
+        return self.get().version
+
+
+registry = ModelRegistry()
+
+# Most inputs are small integers or half hours, so the same vectors recur
+# across students. Keyed on (model version, float32 feature tuple) — the
+# forest compares float32 inputs, so equal keys always predict the same.
+prediction_cache = LRUCache(maxsize=PREDICTION_CACHE_SIZE)
+registry.reload_listeners.append(prediction_cache.clear)
+
+
+def warm_up():
+    """
+    Loads the model and runs one prediction so the first request doesn't
+    pay for it. Call in the master process of a pre-fork server (e.g.
+    gunicorn --preload) so workers share the loaded pages.
+    """
+    loaded = registry.get()
+    predict_stress_batch(np.zeros((1, loaded.n_features)))
+    return loaded.version
+
+
+def reload_model():
+    """Reloads model.pkl / label_encoder.pkl now and returns the new version."""
+    return registry.reload().version
+
+
+def use_compiled_forest(enabled=True):
+    """
+    Chooses how predictions are computed:
+        True   flattened NumPy evaluator — the forest file, or model.pkl
+               compiled when it is loaded
+        False  sklearn's predict_proba on model.pkl, even if a forest
+               file is present
+        None   the default: the forest file when it is current, else sklearn
+    """
+    registry.use_compiled = enabled
+    if registry._loaded is not None:
+        registry.reload()
+
+
+# ── PREDICTION ────────────────────────────────────────────────
+
+
+def predict_stress_batch(rows):
+    """
+    Predicts stress levels for many feature vectors in one call.
+
+    rows = 2-D sequence / array, one row per student, same column
+           order as predict_stress()
+
+    Returns:
+        labels (ndarray of str):       "Low", "Moderate", or "High" per row
+        confidences (ndarray of float): percentage confidence per row (0-100)
+    """
+
+    loaded = registry.get()
+    features_array = np.asarray(rows, dtype=np.float64).reshape(-1, loaded.n_features)
+
+    if prediction_cache.maxsize <= 0 or len(features_array) > PREDICTION_CACHE_MAX_BATCH:
+        return _predict(loaded, features_array)
+
+    epoch = prediction_cache.epoch
+    keys = [(loaded.version, row) for row in map(tuple, features_array.astype(np.float32).tolist())]
+    labels = np.empty(len(keys), dtype=loaded.class_labels.dtype)
+    confidences = np.empty(len(keys))
+
+    missing = []
+    for i, key in enumerate(keys):
+        hit = prediction_cache.get(key)
+        if hit is None:
+            missing.append(i)
+        else:
+            labels[i], confidences[i] = hit
+
+    # Only the vectors never seen before go through the trees
+    if missing:
+        new_labels, new_confidences = _predict(loaded, features_array[missing])
+        labels[missing] = new_labels
+        confidences[missing] = new_confidences
+        for i, label, confidence in zip(missing, new_labels, new_confidences):
+            prediction_cache.set(keys[i], (label, confidence), epoch=epoch)
+
+    return labels, confidences
+
+
+def _predict(loaded, features_array):
+    # Single pass over the trees — the predicted class is just the argmax
+    if loaded.compiled is not None:
+        probabilities = loaded.compiled.predict_proba(features_array)
+    else:
+        probabilities = loaded.model.predict_proba(features_array)
+
+    best = probabilities.argmax(axis=1)
+    labels = loaded.class_labels[best]
+    confidences = np.round(probabilities[np.arange(len(best)), best] * 100, 2)
+
+    return labels, confidences
 
 
 def predict_stress(features):
@@ -33,13 +507,5 @@ def predict_stress(features):
         confidence (float):     percentage confidence (0-100)
     """
 
-    features_array = np.array(features).reshape(1, -1)
-
-    prediction_encoded = model.predict(features_array)[0]
-    prediction_label = label_encoder.inverse_transform([prediction_encoded])[0]
-
-    # Probability for each class
-    probabilities = model.predict_proba(features_array)[0]
-    confidence = max(probabilities) * 100
-
-    return prediction_label, round(confidence, 2)
\ No newline at end of file
+    labels, confidences = predict_stress_batch([features])
+    return str(labels[0]), float(confidences[0])
@@ -28,15 +28,91 @@ assignment_pressure INTEGER  — 1 (none) to 10 (overwhelming)
 study_consistency   INTEGER  — 1 (irregular) to 10 (consistent)
 performance_trend   INTEGER  — -1 (declining), 0 (stable), 1 (improving)
 created_at          DATETIME — auto-set on log submission
+scoring_pending     BOOLEAN  — True while queued for background scoring (ASYNC_SCORING)
+scoring_attempts    INTEGER  — failed scoring attempts; after SCORING_MAX_ATTEMPTS the log
+                             leaves the queue (`flask --app app score-pending --retry-failed`)
+anomaly             BOOLEAN  — unusual against the student's own baseline
+anomaly_z           FLOAT    — largest z in a harmful direction (lower sleep/mood/consistency,
+                             higher study hours/pressure); NULL = too little history
+anomaly_feature     TEXT     — feature that triggered the anomaly
+INDEX ix_daily_stress_log_user_created (user_id, created_at)
 
 TABLE: stress_prediction_result
 --------------------------------
 id                  INTEGER  PRIMARY KEY
 user_id             INTEGER  FK → user.id
+log_id              INTEGER  FK → daily_stress_log.id — log this was scored from
+                             (linked by upgrade-db for predictions stored before it existed)
 stress_prediction   TEXT     — 'Low', 'Moderate', or 'High'
 stress_confidence   FLOAT    — ML model confidence (0-100%)
 burnout_risk        FLOAT    — rule-based burnout score (0-100%)
 suggested_action    TEXT     — AI-generated recommendation
-alert_sent          BOOLEAN  — True if burnout > 70% or prediction = High
+alert_sent          BOOLEAN  — True if burnout > 70%, prediction = High or the log is an anomaly
+model_version       TEXT     — version of the model that produced it (NULL = before tracking)
 created_at          DATETIME — auto-set on prediction
+INDEX ix_stress_prediction_result_user_created (user_id, created_at)
+INDEX ix_stress_prediction_result_alert_id (alert_sent, id)
+
+TABLE: daily_stress_rollup
+--------------------------
+user_id             INTEGER  FK → user.id  } PRIMARY KEY
+day                 DATE                   }
+low_count           INTEGER  — predictions per level that day
+moderate_count      INTEGER
+high_count          INTEGER
+burnout_sum         FLOAT    — mean burnout = burnout_sum / total count
+burnout_max         FLOAT
+alert_count         INTEGER  — alerts raised that day
+latest_at           DATETIME — the day's most recent prediction…
+latest_level        TEXT     — …its stress level
+latest_alert        BOOLEAN  — …and its alert flag
+Updated in the same transaction as every new prediction and every
+rescore chunk; rebuilt from stress_prediction_result by
+`flask --app app rebuild-rollups`.
+
+TABLE: rescore_checkpoint
+-------------------------
+model_version       TEXT     PRIMARY KEY — model the history is being re-scored with
+last_log_id         INTEGER  — every log up to this id is done
+rescored            INTEGER  — results updated so far
+started_at          DATETIME
+updated_at          DATETIME
+finished_at         DATETIME — NULL while the run is incomplete
+Written by `flask --app app rescore`, which resumes from last_log_id.
+
+TABLE: data_generation
+----------------------
+name                TEXT     PRIMARY KEY — "results"
+generation          INTEGER  — bumped whenever stored logs/results are rewritten in place
+Bumped by `flask --app app rescore` (every chunk) and rebuild-baselines;
+part of the page cache and chat prompt versions.
+
+TABLE: student_feature_stats
+----------------------------
+user_id             INTEGER  FK → user.id  } PRIMARY KEY
+feature             TEXT                   } — study_hours, sleep_hours, mood_level, …
+count               INTEGER  — logs folded in
+mean                FLOAT    — running mean (Welford)
+m2                  FLOAT    — sum of squared deviations; variance = m2 / (count - 1)
+ewma                FLOAT    — exponentially weighted recent level
+updated_at          DATETIME
+Updated in the same transaction as every new log; rebuilt from
+daily_stress_log by `flask --app app rebuild-baselines`.
+
+TABLE: stress_prediction_archive
+--------------------------------
+id                  INTEGER  PRIMARY KEY
+result_id           INTEGER  FK → stress_prediction_result.id — the prediction that was replaced
+log_id … created_at          — the result's columns as they were, incl. its model_version
+archived_at         DATETIME — when re-scoring replaced it
+Written by `flask --app app rescore` before it updates a result, so every
+earlier model's predictions are kept; stress_prediction_result always
+holds the current one.
+
+MIGRATIONS
+----------
+Existing databases are upgraded in place by `flask --app app upgrade-db`
+(also run by `python app.py`): missing tables, nullable columns and
+indexes are created, and predictions stored before log_id existed are
+linked to their logs; nothing is dropped.
 """
\ No newline at end of file
@@ -0,0 +1,103 @@
+# oidc.py
+#
+# On-disk cache of an OpenID provider's discovery document and signing keys,
+# so worker processes don't fetch them from the network on their first login.
+
+import json
+import logging
+import os
+import time
+
+import requests
+
+from cache import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderMetadataCache:
+    """
+    Discovery metadata plus the provider's JWKS (under "jwks", where
+    authlib looks for it), cached in one JSON file.
+
+    load() serves the file while it is younger than `ttl` seconds, and
+    otherwise fetches both documents again. If the provider can't be reached
+    it falls back to the stale copy, so logins keep working offline.
+    `override_path` points at a fixed metadata file (for tests or air-gapped
+    setups). It is always used as-is and nothing is ever fetched.
+    """
+
+    def __init__(self, metadata_url, cache_path, ttl=24 * 3600, override_path=None, timeout=10):
+        self.metadata_url = metadata_url
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.override_path = override_path
+        self.timeout = timeout
+
+    def _read(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def fetch(self):
+        response = requests.get(self.metadata_url, timeout=self.timeout)
+        response.raise_for_status()
+        metadata = response.json()
+
+        if metadata.get("jwks_uri"):
+            response = requests.get(metadata["jwks_uri"], timeout=self.timeout)
+            response.raise_for_status()
+            metadata["jwks"] = response.json()
+        return metadata
+
+    def store(self, metadata, fetched_at=None):
+        """Writes metadata to the cache file atomically (temp file + rename)."""
+        entry = {
+            "fetched_at": fetched_at or time.time(),
+            "metadata":   {k: v for k, v in metadata.items() if not k.startswith("_")},
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+
+        def write(tmp_path):
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+
+        atomic_write(self.cache_path, write)
+
+    def load(self, allow_fetch=True):
+        """
+        Returns:
+            metadata (dict): discovery fields + "jwks" + "_loaded_at" (when
+                             it was fetched), or None if there is no copy
+                             and fetching is not allowed or fails
+        """
+        if self.override_path:
+            metadata = self._read(self.override_path)
+            if metadata is None:
+                raise FileNotFoundError(f"OpenID metadata override {self.override_path} is missing or invalid")
+            return {**metadata, "_loaded_at": time.time()}
+
+        cached = self._read(self.cache_path)
+        if cached and (time.time() - cached["fetched_at"] < self.ttl or not allow_fetch):
+            return {**cached["metadata"], "_loaded_at": cached["fetched_at"]}
+        if not allow_fetch:
+            return None
+
+        try:
+            metadata = self.fetch()
+        except (requests.RequestException, ValueError):
+            if not cached:
+                logger.exception("Could not fetch OpenID metadata from %s", self.metadata_url)
+                return None
+            logger.warning("Could not refresh OpenID metadata from %s; using the cached copy", self.metadata_url)
+            # Counts as fresh again, so a provider outage isn't retried on every login
+            return {**cached["metadata"], "_loaded_at": time.time()}
+
+        fetched_at = time.time()
+        try:
+            self.store(metadata, fetched_at)
+        except OSError:
+            logger.exception("Could not write OpenID metadata cache %s", self.cache_path)
+        return {**metadata, "_loaded_at": fetched_at}
@@ -0,0 +1,74 @@
+# pubsub.py
+#
+# In-process publish/subscribe for pushing events to open streaming responses.
+
+import queue
+import threading
+
+
+class Subscription:
+    """One subscriber's bounded inbox; iterate with get()."""
+
+    def __init__(self, broker, maxsize):
+        self._broker = broker
+        self._queue = queue.Queue(maxsize)
+        self.dropped = 0
+
+    def _put(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            # A stalled client must never block publishers
+            self.dropped += 1
+
+    def get(self, timeout=None):
+        """Next message, or None if nothing arrived within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Broker:
+    """
+    Fan-out of messages to every current subscriber.
+
+    Only reaches subscribers in this process. Anything that must survive a
+    missed message (another worker published it, the subscriber's inbox was
+    full, the client reconnected) has to be re-read from the database —
+    treat a message as "something new happened", not as the only copy.
+    """
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription(self, self.maxsize)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._put(message)
+        return len(subscribers)
+
+    def __len__(self):
+        return len(self._subscribers)
@@ -0,0 +1,29 @@
+# tests/conftest.py
+#
+# Runs the app against a throwaway SQLite file — never the real instance database.
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix="stressai-test-")
+atexit.register(shutil.rmtree, TEST_DIR, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DIR, 'app.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app import app as flask_app, db
+
+
+@pytest.fixture
+def app():
+    """The app inside an app context, on an empty schema."""
+    with flask_app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        yield flask_app
+        db.session.remove()
@@ -0,0 +1,77 @@
+# tests/test_alert_stream.py
+
+from datetime import datetime
+
+import app as app_module
+from app import StressPredictionResult, User, db, latest_alert_id
+from werkzeug.security import generate_password_hash
+
+
+def add_result(user, result_id, alert):
+    db.session.add(StressPredictionResult(
+        id=result_id, user_id=user.id, stress_prediction="High" if alert else "Low",
+        burnout_risk=80 if alert else 10, alert_sent=alert, created_at=datetime.utcnow()
+    ))
+
+
+def test_latest_alert_id_uses_the_alert_index(app):
+    plan = db.session.execute(db.text(
+        "EXPLAIN QUERY PLAN SELECT max(id) FROM stress_prediction_result WHERE alert_sent = 1"
+    )).all()
+    assert "ix_stress_prediction_result_alert_id" in " ".join(str(row) for row in plan)
+
+
+def test_stream_sends_alerts_that_commit_behind_the_cursor(app, monkeypatch):
+    monkeypatch.setattr(app_module, "ALERT_STREAM_HEARTBEAT", 0.05)
+    monkeypatch.setattr(app_module, "ALERT_STREAM_MAX_AGE", 2)
+    counselor = User(username="counselor", password=generate_password_hash("pw"), role="counselor")
+    student = User(username="student", role="student")
+    db.session.add_all([counselor, student])
+    db.session.flush()
+    # id 4 is still "in flight" when the page loads
+    for result_id in (1, 2, 3, 5, 6):
+        add_result(student, result_id, alert=result_id in (2, 6))
+    db.session.commit()
+    assert latest_alert_id() == 6
+
+    client = app.test_client()
+    client.post("/login", data={"username": "counselor", "password": "pw"})
+    response = client.get("/counselor/alerts/stream?after=6", buffered=False)
+    events = iter(response.response)
+    assert next(events).startswith(b"retry")
+
+    add_result(student, 4, alert=True)
+    add_result(student, 7, alert=True)
+    db.session.commit()
+
+    sent = []
+    for chunk in events:
+        if b"event: alert" in chunk:
+            sent.append(chunk)
+        if len(sent) == 2:
+            break
+    response.close()
+
+    assert len(sent) == 2
+    assert b'"id": 4' in sent[0] and sent[0].startswith(b"id: 6\n")
+    assert b'"id": 7' in sent[1] and sent[1].startswith(b"id: 7\n")
+
+
+def test_streams_that_never_start_leave_no_subscription(app, monkeypatch):
+    monkeypatch.setattr(app_module, "ALERT_STREAM_MAX_CLIENTS", 1)
+    counselor = User(username="counselor", password=generate_password_hash("pw"), role="counselor")
+    db.session.add(counselor)
+    db.session.commit()
+
+    client = app.test_client()
+    client.post("/login", data={"username": "counselor", "password": "pw"})
+    for _ in range(3):
+        # Disconnects before the first chunk is read
+        client.get("/counselor/alerts/stream", buffered=False).close()
+    assert len(app_module.alert_broker) == 0
+
+    response = client.get("/counselor/alerts/stream", buffered=False)
+    assert next(iter(response.response)).startswith(b"retry")
+    assert client.get("/counselor/alerts/stream").status_code == 503
+    response.close()
+    assert len(app_module.alert_broker) == 0
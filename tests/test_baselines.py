@@ -0,0 +1,71 @@
+# tests/test_baselines.py
+
+import io
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as app_module
+from app import (DailyStressLog, StudentFeatureStats, counselor_page_version, import_daily_logs, rebuild_baselines,
+                 student_data_version)
+
+
+def steady_history_csv(days=12):
+    start = datetime(2026, 1, 1, 9, 0)
+    header = "student_name,study_hours,sleep_hours,mood_level,assignment_pressure,study_consistency,created_at\n"
+    rows = [
+        f"Student {s},{5 + d % 2},{7 + (d % 3) * 0.5},{6 + d % 2},5,7,{start + timedelta(days=d, minutes=s)}"
+        for s in range(3) for d in range(days)
+    ]
+    # Student 0 sleeps two hours on the last day
+    rows.append(f"Student 0,5,2,6,5,7,{start + timedelta(days=days)}")
+    return io.StringIO(header + "\n".join(rows) + "\n")
+
+
+def snapshot():
+    stats = {(s.user_id, s.feature): (s.count, round(s.mean, 9), round(s.m2, 9), round(s.ewma, 9))
+             for s in StudentFeatureStats.query}
+    flags = {log.id: (log.anomaly, log.anomaly_feature) for log in DailyStressLog.query}
+    return stats, flags
+
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_incremental_baselines_match_a_rebuild(app, monkeypatch, upsert):
+    if not upsert:
+        monkeypatch.setattr(app_module, "dialect_insert", lambda: None)
+
+    summary = import_daily_logs(steady_history_csv(), chunk_size=5)
+    incremental = snapshot()
+
+    anomalies = [flag for flag in incremental[1].values() if flag[0]]
+    assert anomalies == [(True, "sleep_hours")]
+    assert summary["alerts"] >= 1
+
+    assert rebuild_baselines(chunk_size=7) == (37, 1)
+    assert snapshot() == incremental
+
+
+def test_rebuilding_in_place_changes_the_cache_versions(app):
+    import_daily_logs(steady_history_csv())
+    user_id = DailyStressLog.query.first().user_id
+    student, counselor = student_data_version(user_id), counselor_page_version()
+
+    # No new ids, but anomaly flags and alerts may have been rewritten
+    rebuild_baselines()
+    assert student_data_version(user_id) != student
+    assert counselor_page_version() != counselor
+
+
+def test_only_harmful_changes_are_anomalies(app):
+    start = datetime(2026, 1, 1, 9, 0)
+    header = "student_name,study_hours,sleep_hours,mood_level,assignment_pressure,study_consistency,created_at\n"
+    rows = [f"Student 0,5,7,5,5,7,{start + timedelta(days=d)}" for d in range(10)]
+    # Far better than usual on every feature, then a bad day
+    rows.append(f"Student 0,1,10,9,1,10,{start + timedelta(days=10)}")
+    rows.append(f"Student 0,5,7,1,5,7,{start + timedelta(days=11)}")
+    import_daily_logs(io.StringIO(header + "\n".join(rows) + "\n"))
+
+    logs = DailyStressLog.query.order_by(DailyStressLog.created_at).all()
+    better, worse = logs[-2], logs[-1]
+    assert not better.anomaly and better.anomaly_z < 0
+    assert worse.anomaly and worse.anomaly_feature == "mood_level"
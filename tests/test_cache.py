@@ -0,0 +1,23 @@
+# tests/test_cache.py
+
+import os
+
+import pytest
+
+from cache import FileCache, atomic_write
+
+
+def test_failed_atomic_write_keeps_the_old_file_and_no_temp(tmp_path):
+    cache = FileCache(str(tmp_path))
+    cache.set("key", b"old")
+
+    def failing_write(path):
+        with open(path, "wb") as f:
+            f.write(b"half")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        atomic_write(cache._path("key"), failing_write)
+
+    assert cache.get("key") == b"old"
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
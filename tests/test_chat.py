@@ -0,0 +1,28 @@
+# tests/test_chat.py
+
+from app import (DailyStressLog, User, chat_context_cache, db, get_system_prompt, score_logs)
+
+
+def check_in(user, mood):
+    log = DailyStressLog(user_id=user.id, study_hours=5, sleep_hours=7, mood_level=mood,
+                         assignment_pressure=5, study_consistency=5, performance_trend=0)
+    db.session.add(log)
+    score_logs([log])
+    db.session.commit()
+
+
+def test_cached_prompt_follows_check_ins_from_other_workers(app):
+    chat_context_cache.clear()
+    student = User(username="student", role="student")
+    db.session.add(student)
+    db.session.commit()
+
+    check_in(student, mood=8)
+    first = get_system_prompt(student)
+    assert get_system_prompt(student) is first     # served from the cache
+    assert "Mood=8/10" in first
+
+    # Stored by another process: this process's cache is never invalidated
+    check_in(student, mood=2)
+    second = get_system_prompt(student)
+    assert "Mood=2/10" in second
@@ -0,0 +1,35 @@
+# tests/test_counselor.py
+
+import re
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from app import StressPredictionResult, User, db
+
+
+def test_counselor_ranks_students_by_their_latest_prediction(app):
+    counselor = User(username="counselor", password=generate_password_hash("pw"), role="counselor")
+    calm, worried, backfilled, new = (User(username=n, role="student") for n in ("calm", "worried", "backfilled", "new"))
+    db.session.add_all([counselor, calm, worried, backfilled, new])
+    db.session.flush()
+    t = datetime(2026, 1, 10, 9)
+
+    def result(user, at, level, burnout):
+        db.session.add(StressPredictionResult(user_id=user.id, stress_prediction=level,
+                                              burnout_risk=burnout, created_at=at))
+
+    result(calm, t - timedelta(days=1), "High", 90)
+    result(calm, t, "Low", 10)
+    result(worried, t, "High", 60)
+    result(backfilled, t, "Moderate", 50)
+    # Imported history: a higher id, but older than the latest prediction
+    result(backfilled, t - timedelta(days=5), "High", 95)
+    db.session.commit()
+
+    client = app.test_client()
+    client.post("/login", data={"username": "counselor", "password": "pw"})
+    page = client.get("/counselor").get_data(as_text=True)
+
+    order = [name for name in re.findall(r">(calm|worried|backfilled|new)<", page)]
+    assert list(dict.fromkeys(order)) == ["worried", "backfilled", "calm", "new"]
@@ -0,0 +1,50 @@
+# tests/test_import.py
+
+import io
+import random
+from datetime import datetime, timedelta
+
+from app import DailyStressLog, User, import_daily_logs
+
+
+def history_csv(name, days, shuffle=False):
+    """Three good weeks, then a steady decline in mood and consistency."""
+    start = datetime(2026, 1, 1, 9, 0)
+    rows = []
+    for day in range(days):
+        mood = 8 if day < 7 else max(1, 8 - (day - 6))
+        rows.append(f"{name},5,7,{mood},5,{mood},{start + timedelta(days=day, minutes=day * 7)}")
+    if shuffle:
+        random.Random(7).shuffle(rows)
+    header = "student_name,study_hours,sleep_hours,mood_level,assignment_pressure,study_consistency,created_at\n"
+    return io.StringIO(header + "\n".join(rows) + "\n")
+
+
+def stored_trends(name):
+    user = User.query.filter_by(username=name.replace(" ", "").lower()).one()
+    logs = DailyStressLog.query.filter_by(user_id=user.id).order_by(DailyStressLog.created_at)
+    return [log.performance_trend for log in logs]
+
+
+def test_single_chunk_trends_see_earlier_rows(app):
+    # One row per chunk: every row is stored before the next one's trend is computed
+    import_daily_logs(history_csv("Row By Row", 21), chunk_size=1)
+    import_daily_logs(history_csv("One Chunk", 21), chunk_size=1000)
+
+    expected = stored_trends("Row By Row")
+    assert -1 in expected
+    assert stored_trends("One Chunk") == expected
+
+
+def test_chunk_trends_do_not_depend_on_file_order(app):
+    import_daily_logs(history_csv("Ordered", 21), chunk_size=1000)
+    import_daily_logs(history_csv("Shuffled", 21, shuffle=True), chunk_size=1000)
+
+    assert stored_trends("Shuffled") == stored_trends("Ordered")
+
+
+def test_trends_continue_from_stored_history(app):
+    import_daily_logs(history_csv("Split", 21), chunk_size=10)
+    import_daily_logs(history_csv("Whole", 21), chunk_size=1)
+
+    assert stored_trends("Split") == stored_trends("Whole")
@@ -0,0 +1,73 @@
+# tests/test_ml_model.py
+
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+
+from ml_model import LABEL_ENCODER_PATH, MODEL_PATH, ModelRegistry, _predict, export_forest, file_version
+
+
+@pytest.fixture
+def model_files(tmp_path):
+    model_path, encoder_path = tmp_path / "model.pkl", tmp_path / "label_encoder.pkl"
+    shutil.copyfile(MODEL_PATH, model_path)
+    shutil.copyfile(LABEL_ENCODER_PATH, encoder_path)
+    forest_path = tmp_path / "model.forest"
+    export_forest(joblib.load(model_path), joblib.load(encoder_path), str(forest_path),
+                  version=file_version(model_path))
+    return str(model_path), str(encoder_path), str(forest_path)
+
+
+def registry_for(model_files, use_compiled):
+    model_path, encoder_path, forest_path = model_files
+    registry = ModelRegistry(model_path, encoder_path, check_interval=-1, forest_path=forest_path)
+    registry.use_compiled = use_compiled
+    return registry
+
+
+def test_forest_file_loads_the_sklearn_model_on_demand(model_files):
+    loaded = registry_for(model_files, None).get()
+    assert loaded.compiled is not None
+    assert loaded._model is None
+
+    assert loaded.model.n_features_in_ == loaded.n_features
+    assert list(loaded.label_encoder.inverse_transform(loaded.model.classes_)) == list(loaded.class_labels)
+
+
+def test_forest_file_refuses_a_mismatched_pickle(model_files):
+    loaded = registry_for(model_files, None).get()
+    loaded.version = "not-the-pickle"
+    with pytest.raises(RuntimeError):
+        loaded.model
+
+
+def test_use_compiled_false_predicts_with_sklearn(model_files):
+    sklearn_model = registry_for(model_files, False).get()
+    compiled_model = registry_for(model_files, None).get()
+    assert sklearn_model.compiled is None
+    assert sklearn_model.version == compiled_model.version
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.integers(0, 25, 300) / 2, rng.integers(6, 21, 300) / 2,
+                         rng.integers(1, 11, (300, 3)), rng.integers(-1, 2, 300)])
+    labels, confidences = _predict(sklearn_model, X)
+    compiled_labels, compiled_confidences = _predict(compiled_model, X)
+    assert labels.tolist() == compiled_labels.tolist()
+    assert np.allclose(confidences, compiled_confidences)
+
+
+def test_large_batches_bypass_the_prediction_cache():
+    from ml_model import PREDICTION_CACHE_MAX_BATCH, predict_stress_batch, prediction_cache
+
+    prediction_cache.clear()
+    rng = np.random.default_rng(1)
+    X = np.column_stack([rng.integers(0, 25, 500) / 2, rng.integers(6, 21, 500) / 2,
+                         rng.integers(1, 11, (500, 3)), rng.integers(-1, 2, 500)])
+
+    predict_stress_batch(X)
+    assert len(prediction_cache) == 0
+
+    predict_stress_batch(X[:PREDICTION_CACHE_MAX_BATCH])
+    assert 0 < len(prediction_cache) <= PREDICTION_CACHE_MAX_BATCH
@@ -0,0 +1,61 @@
+# tests/test_rescore.py
+
+import io
+
+import pytest
+
+import app as app_module
+
+from app import (StressPredictionArchive, StressPredictionResult, db, import_daily_logs, rebuild_rollups,
+                 rescore_history)
+from test_rollups import rollup_rows
+
+
+def test_rescoring_archives_the_replaced_predictions(app):
+    csv = "student_name,study_hours,sleep_hours,mood_level,assignment_pressure,study_consistency\n"
+    csv += "".join(f"Student {i % 3},{i % 12},{4 + i % 5},{1 + i % 10},{1 + i % 10},{1 + i % 9}\n" for i in range(30))
+    import_daily_logs(io.StringIO(csv))
+
+    # Pretend an older model produced them
+    db.session.execute(db.update(StressPredictionResult).values(model_version="old", stress_prediction="Moderate"))
+    db.session.commit()
+    before = {r.id: (r.log_id, r.created_at) for r in StressPredictionResult.query}
+
+    version, rescored = rescore_history(chunk_size=7)
+    assert rescored == 30
+
+    archived = StressPredictionArchive.query.all()
+    assert sorted(a.result_id for a in archived) == sorted(before)
+    assert {(a.model_version, a.stress_prediction) for a in archived} == {("old", "Moderate")}
+    assert all((a.log_id, a.created_at) == before[a.result_id] for a in archived)
+    assert {r.model_version for r in StressPredictionResult.query} == {version}
+
+    # Nothing left to re-score, nothing archived twice
+    assert rescore_history()[1] == 30
+    assert StressPredictionArchive.query.count() == 30
+
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_rescoring_keeps_the_rollups_in_step(app, monkeypatch, upsert):
+    if not upsert:
+        monkeypatch.setattr(app_module, "dialect_insert", lambda: None)
+
+    csv = "student_name,study_hours,sleep_hours,mood_level,assignment_pressure,study_consistency,created_at\n"
+    csv += "".join(
+        f"Student {i % 3},{i % 12},{4 + i % 5},{1 + i % 10},{1 + i % 10},{1 + i % 9},2026-01-{1 + i % 4:02d} {8 + i % 9}:00\n"
+        for i in range(40)
+    )
+    import_daily_logs(io.StringIO(csv))
+
+    # Pretend an older model produced them, with the rollups to match
+    db.session.execute(db.update(StressPredictionResult).values(
+        model_version="old", stress_prediction="High", burnout_risk=95, alert_sent=True
+    ))
+    db.session.commit()
+    rebuild_rollups()
+
+    rescore_history(chunk_size=6)
+    adjusted = rollup_rows()
+    rebuild_rollups()
+    assert adjusted == rollup_rows()
+    assert any(row[6] < 95 for row in adjusted)     # burnout_max came down
@@ -0,0 +1,50 @@
+# tests/test_rollups.py
+
+from datetime import datetime, timedelta
+
+import app as app_module
+from app import DailyStressRollup, User, db, record_rollups
+
+
+def prediction(user, at, level, burnout, alert):
+    return {"user_id": user.id, "created_at": at, "stress_prediction": level,
+            "burnout_risk": burnout, "alert_sent": alert}
+
+
+def rollup_rows():
+    return sorted(
+        (r.user_id, r.day, r.low_count, r.moderate_count, r.high_count, r.burnout_sum,
+         r.burnout_max, r.alert_count, r.latest_at, r.latest_level, r.latest_alert)
+        for r in DailyStressRollup.query
+    )
+
+
+def record_history():
+    alice, bob = User(username="alice"), User(username="bob")
+    db.session.add_all([alice, bob])
+    db.session.flush()
+    t = datetime(2026, 1, 1, 9)
+
+    batches = [
+        [prediction(alice, t, "Low", 10, False), prediction(bob, t, "High", 80, True)],
+        [prediction(alice, t + timedelta(hours=2), "High", 75, True),
+         prediction(alice, t + timedelta(days=1), "Moderate", 45, False)],
+        # Arrives late: older than the day's latest prediction
+        [prediction(alice, t + timedelta(hours=1), "Moderate", 50, False)],
+    ]
+    for batch in batches:
+        record_rollups(batch)
+        db.session.commit()
+    return rollup_rows()
+
+
+def test_generic_merge_matches_upsert(app, monkeypatch):
+    upserted = record_history()
+
+    db.drop_all()
+    db.create_all()
+    monkeypatch.setattr(app_module, "dialect_insert", lambda: None)
+    merged = record_history()
+
+    assert merged == upserted
+    assert [(r[2], r[3], r[4], r[7], r[9]) for r in merged if r[1].day == 1 and r[0] == 1] == [(1, 1, 1, 1, "High")]
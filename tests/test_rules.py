@@ -0,0 +1,61 @@
+# tests/test_rules.py
+
+import numpy as np
+import pandas as pd
+
+from app import SUGGESTED_ACTIONS, rule_based_logic, rule_based_logic_batch
+
+# Every threshold in rule_based_logic, with values just below, on and above it
+EDGES = {
+    "sleep_hours":         [0, 5.5, 5.99, 6, 6.01, 6.5, 12],
+    "study_hours":         [0, 5.5, 5.99, 6, 6.01, 6.5, 12],
+    "mood_level":          [1, 3, 4, 5, 10],
+    "assignment_pressure": [1, 7, 8, 9, 10],
+    "study_consistency":   [1, 3, 4, 5, 10],
+    "performance_trend":   [-1, 0, 1],
+}
+CONFIDENCE_EDGES = [0, 50, 79.99, 80, 80.01, 100]
+LEVELS = ["Low", "Moderate", "High"]
+
+
+def random_records(rng, n):
+    columns = {name: rng.choice(values, n) for name, values in EDGES.items()}
+    levels = rng.choice(LEVELS, n)
+    confidences = rng.choice(CONFIDENCE_EDGES, n)
+    return columns, levels, confidences
+
+
+def per_row(columns, levels, confidences):
+    records = [dict(zip(columns, values)) for values in zip(*columns.values())]
+    return [rule_based_logic(r, level, c) for r, level, c in zip(records, levels, confidences)]
+
+
+def test_batch_matches_per_row_rules():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        columns, levels, confidences = random_records(rng, 500)
+        burnout, codes = rule_based_logic_batch(columns, levels, confidences)
+
+        expected = per_row(columns, levels, confidences)
+        assert burnout.tolist() == [risk for risk, _ in expected]
+        assert [SUGGESTED_ACTIONS[c] for c in codes] == [suggestion for _, suggestion in expected]
+
+
+def test_batch_covers_every_risk_band():
+    rng = np.random.default_rng(1)
+    columns, levels, confidences = random_records(rng, 5000)
+    burnout, codes = rule_based_logic_batch(columns, levels, confidences)
+
+    # The cap and both suggestion thresholds are exercised
+    assert burnout.max() == 100
+    assert {40, 70} <= set(burnout.tolist())
+    assert set(codes.tolist()) == {0, 1, 2}
+
+
+def test_batch_accepts_a_dataframe():
+    rng = np.random.default_rng(2)
+    columns, levels, confidences = random_records(rng, 200)
+
+    from_frame = rule_based_logic_batch(pd.DataFrame(columns), list(levels), list(confidences))
+    from_arrays = rule_based_logic_batch(columns, levels, confidences)
+    assert all(np.array_equal(a, b) for a, b in zip(from_frame, from_arrays))
@@ -0,0 +1,38 @@
+# tests/test_scoring.py
+
+import app as app_module
+from app import DailyStressLog, StressPredictionResult, User, db, score_pending_logs
+
+
+def test_a_log_that_keeps_failing_leaves_the_queue(app, monkeypatch):
+    student = User(username="student", role="student")
+    db.session.add(student)
+    db.session.commit()
+    for mood in range(1, 5):
+        db.session.add(DailyStressLog(user_id=student.id, study_hours=5, sleep_hours=7, mood_level=mood,
+                                      assignment_pressure=5, study_consistency=5, performance_trend=0,
+                                      scoring_pending=True))
+    db.session.commit()
+    poison = DailyStressLog.query.filter_by(mood_level=3).one().id
+
+    score_logs = app_module.score_logs
+
+    def failing_score_logs(logs):
+        if any(log.id == poison for log in logs):
+            raise ValueError("bad log")
+        return score_logs(logs)
+
+    monkeypatch.setattr(app_module, "score_logs", failing_score_logs)
+    monkeypatch.setitem(app.config, "SCORING_MAX_ATTEMPTS", 2)
+
+    # The good logs are scored despite sharing a batch with the bad one
+    assert score_pending_logs(10) == 3
+    assert StressPredictionResult.query.count() == 3
+    db.session.expire_all()
+    assert db.session.get(DailyStressLog, poison).scoring_pending
+
+    assert score_pending_logs(10) == 0
+    db.session.expire_all()
+    log = db.session.get(DailyStressLog, poison)
+    assert not log.scoring_pending and log.scoring_attempts == 2
+    assert score_pending_logs(10) == 0
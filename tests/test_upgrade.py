@@ -0,0 +1,48 @@
+# tests/test_upgrade.py
+
+from datetime import datetime, timedelta
+
+from app import DailyStressLog, StressPredictionResult, User, backfill_result_log_ids, db
+
+
+def add_log(user, at):
+    log = DailyStressLog(user_id=user.id, study_hours=5, sleep_hours=7, mood_level=5,
+                         assignment_pressure=5, study_consistency=5, performance_trend=0, created_at=at)
+    db.session.add(log)
+    return log
+
+
+def add_result(user, at, log=None):
+    result = StressPredictionResult(user_id=user.id, log_id=log.id if log else None,
+                                    stress_prediction="Low", burnout_risk=0, created_at=at)
+    db.session.add(result)
+    return result
+
+
+def test_legacy_results_are_linked_to_their_logs(app):
+    alice, bob = User(username="alice"), User(username="bob")
+    db.session.add_all([alice, bob])
+    db.session.flush()
+    t = datetime(2026, 1, 1, 9)
+
+    orphan = add_result(alice, t - timedelta(days=1))          # older than any log
+    day1 = add_log(alice, t)
+    unscored = add_log(alice, t + timedelta(days=1))           # never got a prediction
+    day3 = add_log(alice, t + timedelta(days=2))
+    bob_log = add_log(bob, t)
+    db.session.flush()
+    linked = add_result(alice, t + timedelta(days=2, seconds=2), day3)
+    first = add_result(alice, t + timedelta(seconds=1))
+    second = add_result(alice, t + timedelta(days=2, seconds=1))
+    bobs = add_result(bob, t + timedelta(seconds=1))
+    db.session.commit()
+
+    assert backfill_result_log_ids() == 3
+    assert db.session.get(StressPredictionResult, first.id).log_id == day1.id
+    # day3 already has a result, so the later legacy one pairs with the log before it
+    assert db.session.get(StressPredictionResult, second.id).log_id == unscored.id
+    assert db.session.get(StressPredictionResult, bobs.id).log_id == bob_log.id
+    assert db.session.get(StressPredictionResult, linked.id).log_id == day3.id
+    assert db.session.get(StressPredictionResult, orphan.id).log_id is None
+
+    assert backfill_result_log_ids() == 0
@@ -0,0 +1,51 @@
+# timeseries.py
+#
+# Downsampling for chart series.
+
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Picks `threshold` of the given points (always keeping the first and
+    last) so that the line keeps its visual shape — peaks and dips survive,
+    unlike plain averaging or striding.
+
+    x, y = equal-length numeric sequences, x ascending
+    Returns the indices of the kept points, ascending.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Everything between the fixed first and last point is split into
+    # threshold - 2 buckets; one point is chosen from each
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    kept = [0]
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point) is the third vertex
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(areas.argmax())
+        kept.append(a)
+
+    kept.append(n - 1)
+    return np.asarray(kept)
@@ -1,96 +1,299 @@
 # train_model.py
+#
+# Trains the stress RandomForest and publishes model.pkl / label_encoder.pkl.
+#
+#   python train_model.py                          # dataset.csv, same as before
+#   python train_model.py --source db --n-jobs -1  # live DailyStressLog history
+#   python train_model.py --source both --since 2024-09-01 --cv-max-rows 200000
+#
+# Every run also keeps a versioned copy under models/ with a JSON summary, so
+# a bad retrain can be rolled back by copying an older pair into place.
+# Publishing also writes model.forest, the flat file app workers memory-map;
+#   python train_model.py --export-only
+# rebuilds it from the current model.pkl without training.
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
 
-import pandas as pd
+import joblib
 import numpy as np
+import pandas as pd
+from sklearn.base import clone
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.ensemble import RandomForestClassifier        # UPGRADED from LogisticRegression
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score, classification_report
-import joblib
+
+from cache import atomic_write
+from ml_model import (BASE_DIR, FEATURE_COLUMNS, MODEL_PATH, LABEL_ENCODER_PATH, FOREST_PATH,
+                      export_forest, file_version)
+
+DATASET_PATH = os.path.join(BASE_DIR, "dataset.csv")
+CACHE_DIR = os.path.join(BASE_DIR, ".train_cache")   # parsed CSVs, keyed on path + mtime + size
+ARTIFACT_DIR = os.path.join(BASE_DIR, "models")      # versioned model / encoder / summary files
+
+DB_CHUNK_SIZE = 50_000
 
 
 # ── Load Dataset ──────────────────────────────────────────────
 
-df = pd.read_csv("dataset.csv")
 
-# FIX: drop blank rows that exist between student groups in the CSV
-df = df.dropna(how='all')
-df = df[df['student_name'].notna()]
+def load_csv(path=DATASET_PATH, use_cache=True):
+    """
+    Reads a training CSV (student_name, feature columns..., stress_level).
+
+    The parsed frame is cached next to the code, so re-running on an
+    unchanged file skips pandas' CSV parsing entirely.
+
+    Returns:
+        X (ndarray float32): one row per record, FEATURE_COLUMNS order
+        y (ndarray of str):  "Low", "Moderate" or "High"
+    """
+    stat = os.stat(path)
+    key = hashlib.sha1(f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:16]
+    cache_path = os.path.join(CACHE_DIR, f"{key}.pkl")
 
-print("Dataset Loaded Successfully\n")
-print(df.head())
-print(f"\nTotal records: {len(df)}")
+    if use_cache and os.path.exists(cache_path):
+        df = pd.read_pickle(cache_path)
+    else:
+        df = pd.read_csv(path)
 
+        # FIX: drop blank rows that exist between student groups in the CSV
+        df = df.dropna(how='all')
+        df = df[df['student_name'].notna()]
 
-# ── Drop Non-ML Column ────────────────────────────────────────
+        # We do NOT use student_name for ML
+        df = df[FEATURE_COLUMNS + ["stress_level"]].reset_index(drop=True)
 
-# We do NOT use student_name for ML
-df = df.drop("student_name", axis=1)
+        if use_cache:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            atomic_write(cache_path, df.to_pickle)
 
+    return df[FEATURE_COLUMNS].to_numpy(dtype=np.float32), df["stress_level"].to_numpy(dtype=str)
 
-# ── Separate Features & Target ────────────────────────────────
 
-X = df.drop("stress_level", axis=1)
-y = df["stress_level"]
+def load_database(since=None, chunk_size=DB_CHUNK_SIZE):
+    """
+    Streams scored DailyStressLog rows out of the app database.
 
+    The label of each log is the stress level stored for it
+    (StressPredictionResult joined via log_id). Those labels are the model's
+    own earlier output; mix in the CSV (--source both) to keep it anchored
+    to ground truth. Rows come out `chunk_size` at a time and go straight
+    into NumPy buffers, so millions of rows never exist as ORM objects.
 
-# ── Encode Target Labels ──────────────────────────────────────
+    Returns:
+        X (ndarray float32), y (ndarray of str) — same shapes as load_csv()
+    """
+    # Imported here so CSV training works without the web app's dependencies
+    from sqlalchemy import select
+    from app import app, db, DailyStressLog, StressPredictionResult
 
-label_encoder = LabelEncoder()
-y_encoded = label_encoder.fit_transform(y)
+    stmt = (
+        select(*[getattr(DailyStressLog, c) for c in FEATURE_COLUMNS], StressPredictionResult.stress_prediction)
+        .join(StressPredictionResult, StressPredictionResult.log_id == DailyStressLog.id)
+        .where(*[getattr(DailyStressLog, c).isnot(None) for c in FEATURE_COLUMNS])
+        .order_by(DailyStressLog.id)
+    )
+    if since is not None:
+        stmt = stmt.where(DailyStressLog.created_at >= since)
 
-print("\nClasses found:", label_encoder.classes_)
+    feature_chunks, label_chunks = [], []
+    with app.app_context():
+        result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+        for rows in result.partitions():
+            chunk = np.array(rows, dtype=object)
+            feature_chunks.append(chunk[:, :-1].astype(np.float32))
+            label_chunks.append(chunk[:, -1].astype(str))
 
-# Save label encoder for use in ml_model.py
-joblib.dump(label_encoder, "label_encoder.pkl")
+    if not feature_chunks:
+        return np.empty((0, len(FEATURE_COLUMNS)), dtype=np.float32), np.empty(0, dtype=str)
+    return np.concatenate(feature_chunks), np.concatenate(label_chunks)
 
 
-# ── Train-Test Split ──────────────────────────────────────────
+def load_training_data(source, dataset=DATASET_PATH, since=None, use_cache=True):
+    parts = []
+    if source in ("csv", "both"):
+        parts.append(load_csv(dataset, use_cache=use_cache))
+    if source in ("db", "both"):
+        parts.append(load_database(since=since))
 
-# FIX: added stratify so each class is proportionally represented in test set
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded
-)
+    X = np.concatenate([p[0] for p in parts])
+    y = np.concatenate([p[1] for p in parts])
+    return X, y
 
 
 # ── Train Random Forest ───────────────────────────────────────
-# UPGRADED: RandomForest handles small datasets and non-linear patterns
-# much better than Logistic Regression
 
-model = RandomForestClassifier(
-    n_estimators=200,
-    max_depth=8,
-    min_samples_split=2,
-    random_state=42,
-    class_weight='balanced'   # handles any class imbalance
-)
-model.fit(X_train, y_train)
 
+def build_model(n_jobs=None, random_state=42):
+    # UPGRADED: RandomForest handles small datasets and non-linear patterns
+    # much better than Logistic Regression
+    return RandomForestClassifier(
+        n_estimators=200,
+        max_depth=8,
+        min_samples_split=2,
+        random_state=random_state,
+        class_weight='balanced',  # handles any class imbalance
+        n_jobs=n_jobs,            # trees are fitted and evaluated in parallel
+    )
+
+
+def train(X, y, n_jobs=-1, cv=5, cv_max_rows=None, random_state=42):
+    """
+    Fits the forest on a stratified 80% split and evaluates it.
+
+    Cross-validation runs the folds in parallel (each fold's forest is
+    single-threaded, so cores aren't oversubscribed); cv_max_rows caps the
+    rows it uses, because CV refits the forest `cv` times. cv=0 skips it.
+
+    Returns:
+        model, label_encoder, report (dict of accuracy / CV scores / sizes)
+    """
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(y)
+
+    # FIX: added stratify so each class is proportionally represented in test set
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y_encoded, test_size=0.2, random_state=random_state, stratify=y_encoded
+    )
+
+    model = build_model(n_jobs=n_jobs, random_state=random_state)
+    model.fit(X_train, y_train)
+
+    y_pred = model.predict(X_test)
+    report = {
+        "rows":       int(len(y)),
+        "classes":    label_encoder.classes_.tolist(),
+        "accuracy":   float(accuracy_score(y_test, y_pred)),
+        "classification_report": classification_report(
+            y_test, y_pred, target_names=label_encoder.classes_, output_dict=True, zero_division=0
+        ),
+        "feature_importances": dict(zip(FEATURE_COLUMNS, model.feature_importances_.round(4).tolist())),
+    }
+
+    # Cross-validation for more reliable accuracy estimate
+    if cv:
+        X_cv, y_cv = X, y_encoded
+        if cv_max_rows and len(y_cv) > cv_max_rows:
+            X_cv, _, y_cv, _ = train_test_split(
+                X, y_encoded, train_size=cv_max_rows, random_state=random_state, stratify=y_encoded
+            )
+        cv_scores = cross_val_score(clone(model).set_params(n_jobs=1), X_cv, y_cv, cv=cv, n_jobs=n_jobs)
+        report["cv_mean"] = float(cv_scores.mean())
+        report["cv_std"] = float(cv_scores.std())
+        report["cv_rows"] = int(len(y_cv))
+
+    return model, label_encoder, report
+
+
+def print_report(report):
+    print(f"\nTotal records: {report['rows']}")
+    print("Classes found:", report["classes"])
+    print("\nModel Accuracy:", round(report["accuracy"] * 100, 2), "%")
+    if "cv_mean" in report:
+        print("CV Accuracy:   ", round(report["cv_mean"] * 100, 2), "% (+/-", round(report["cv_std"] * 100, 2), "%)")
+
+    print("\nClassification Report:\n")
+    print(f"{'':<14}{'precision':>10}{'recall':>10}{'f1-score':>10}{'support':>10}")
+    for name in report["classes"]:
+        row = report["classification_report"][name]
+        print(f"{name:<14}{row['precision']:>10.2f}{row['recall']:>10.2f}{row['f1-score']:>10.2f}{row['support']:>10.0f}")
+
+    # ── Feature Importance (bonus insight) ──
+    print("\nFeature Importances:")
+    for name, score in sorted(report["feature_importances"].items(), key=lambda x: -x[1]):
+        print(f"  {name}: {round(score * 100, 1)}%")
 
-# ── Evaluate Model ────────────────────────────────────────────
 
-y_pred = model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
+# ── Save Model ────────────────────────────────────────────────
 
-# Cross-validation for more reliable accuracy estimate
-cv_scores = cross_val_score(model, X, y_encoded, cv=5)
 
-print("\nModel Accuracy:", round(accuracy * 100, 2), "%")
-print("CV Accuracy:   ", round(cv_scores.mean() * 100, 2), "% (+/-", round(cv_scores.std() * 100, 2), "%)")
-print("\nClassification Report:\n")
-print(classification_report(y_test, y_pred, target_names=label_encoder.classes_))
+def save_artifacts(model, label_encoder, report, artifact_dir=ARTIFACT_DIR, publish=True,
+                   model_path=MODEL_PATH, label_encoder_path=LABEL_ENCODER_PATH, forest_path=FOREST_PATH):
+    """
+    Writes models/model-<version>.pkl, label_encoder-<version>.pkl and
+    model-<version>.json, then (if publish) copies the pair over the live
+    model.pkl / label_encoder.pkl the app serves from and exports
+    model.forest last, so it is never older than model.pkl.
 
+    The encoder is published first: a running app reloads when either file
+    changes, and an old model with the new encoder is harmless as long as
+    the classes are unchanged, while the reverse pairing never happens.
 
-# ── Feature Importance (bonus insight) ───────────────────────
+    Returns:
+        version (str): timestamp the artifacts are named after
+    """
+    version = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    os.makedirs(artifact_dir, exist_ok=True)
 
-feature_names = X.columns.tolist()
-importances = model.feature_importances_
-print("Feature Importances:")
-for name, score in sorted(zip(feature_names, importances), key=lambda x: -x[1]):
-    print(f"  {name}: {round(score * 100, 1)}%")
+    versioned_model = os.path.join(artifact_dir, f"model-{version}.pkl")
+    versioned_encoder = os.path.join(artifact_dir, f"label_encoder-{version}.pkl")
+    atomic_write(versioned_encoder, lambda p: joblib.dump(label_encoder, p))
+    atomic_write(versioned_model, lambda p: joblib.dump(model, p))
 
+    # Same hash the app reports as the model version
+    sha1 = file_version(versioned_model)
+
+    summary = {"version": version, "sha1": sha1, "trained_at": datetime.utcnow().isoformat(timespec="seconds"),
+               "published": publish, **report}
+
+    def write_summary(path):
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    atomic_write(os.path.join(artifact_dir, f"model-{version}.json"), write_summary)
+
+    if publish:
+        atomic_write(label_encoder_path, lambda p: shutil.copyfile(versioned_encoder, p))
+        atomic_write(model_path, lambda p: shutil.copyfile(versioned_model, p))
+        export_forest(model, label_encoder, forest_path, version=sha1)
+
+    return version
+
+
+# ── CLI ───────────────────────────────────────────────────────
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the stress prediction model")
+    parser.add_argument("--source", choices=("csv", "db", "both"), default="csv",
+                        help="dataset.csv, the app's DailyStressLog history, or both")
+    parser.add_argument("--dataset", default=DATASET_PATH, help="training CSV (default: dataset.csv)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only DB logs created on/after this date")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="cores for fitting and CV (-1 = all)")
+    parser.add_argument("--cv", type=int, default=5, help="cross-validation folds (0 skips CV)")
+    parser.add_argument("--cv-max-rows", type=int, default=None, help="subsample CV to this many rows")
+    parser.add_argument("--no-cache", action="store_true", help="re-parse the CSV even if it is cached")
+    parser.add_argument("--no-publish", action="store_true",
+                        help="only write the versioned copy under models/, leave model.pkl alone")
+    parser.add_argument("--export-only", action="store_true",
+                        help="don't train; rebuild model.forest from the current model.pkl")
+    args = parser.parse_args(argv)
+
+    if args.export_only:
+        export_forest(joblib.load(MODEL_PATH), joblib.load(LABEL_ENCODER_PATH), FOREST_PATH,
+                      version=file_version(MODEL_PATH))
+        print(f"Exported {MODEL_PATH} to {FOREST_PATH}")
+        return
+
+    X, y = load_training_data(args.source, args.dataset, since=args.since, use_cache=not args.no_cache)
+    print("Dataset Loaded Successfully")
+
+    model, label_encoder, report = train(X, y, n_jobs=args.n_jobs, cv=args.cv, cv_max_rows=args.cv_max_rows)
+    report.update({"source": args.source, "since": args.since.isoformat() if args.since else None})
+    print_report(report)
+
+    version = save_artifacts(model, label_encoder, report, publish=not args.no_publish)
+    if args.no_publish:
+        print(f"\nModel saved as models/model-{version}.pkl (not published)")
+    else:
+        print(f"\nModel saved successfully as model.pkl (version {version})")
 
-# ── Save Model ────────────────────────────────────────────────
 
-joblib.dump(model, "model.pkl")
-print("\nModel saved successfully as model.pkl")
\ No newline at end of file
+if __name__ == "__main__":
+    main()